@@ -3,25 +3,91 @@
 Craigslist Listings Viewer - Flask App
 """
 
-from flask import Flask, render_template, jsonify, request, redirect, url_for, flash
-from werkzeug.utils import secure_filename
+from flask import Flask, Response, render_template, jsonify, request, redirect, url_for, flash
+from flask.json.provider import JSONProvider
+from jinja2 import FileSystemBytecodeCache
+from streaming_form_data import StreamingFormDataParser
+from streaming_form_data.targets import BaseTarget, ValueTarget
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
+import psycopg2.pool
+from psycopg2 import sql
+import atexit
+from contextlib import contextmanager
 import json
+import math
+import decimal
+import functools
+import hashlib
+import orjson
 import os
-from datetime import datetime
+import stat
+import tempfile
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 import requests
 from requests.auth import HTTPBasicAuth
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import threading
+import time
+from datetime import datetime
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 from scraper import scrape_craigslist
 
 # Load environment variables from .env file
 load_dotenv()
 
+def _json_default(obj):
+    """Serialize types orjson does not handle natively"""
+    if isinstance(obj, decimal.Decimal):
+        # Same representation as Flask's default provider
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS),
+            mimetype='application/json'
+        )
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'your-secret-key-change-in-production')
 
+# Cache compiled templates on disk so new workers skip lex/parse/compile.
+# Without JINJA_CACHE_DIR, Jinja picks a private per-user temp directory
+# and checks its ownership itself; an explicit directory gets the same checks
+# here, since cached bytecode is loaded and executed.
+JINJA_CACHE_DIR = os.getenv('JINJA_CACHE_DIR')
+if JINJA_CACHE_DIR:
+    os.makedirs(JINJA_CACHE_DIR, mode=0o700, exist_ok=True)
+    _cache_stat = os.lstat(JINJA_CACHE_DIR)
+    if (not stat.S_ISDIR(_cache_stat.st_mode)
+            or _cache_stat.st_uid != os.getuid()
+            or _cache_stat.st_mode & 0o077):
+        raise RuntimeError(
+            f"JINJA_CACHE_DIR {JINJA_CACHE_DIR} must be a directory owned by "
+            f"the current user and not accessible to group or others"
+        )
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(
+    directory=JINJA_CACHE_DIR,
+    pattern='__jinja2_%s.cache'
+)
+
 # Database configuration from environment variables
 DB_CONFIG = {
     'host': os.getenv('DB_HOST'),
@@ -31,64 +97,443 @@ DB_CONFIG = {
     'port': os.getenv('DB_PORT', '5432')
 }
 
+class PreparingConnection(psycopg2.extensions.connection):
+    """Connection that remembers whether the hot statements were prepared on it"""
+    prepared = False
+
+# Process-wide connection pool so requests reuse authenticated connections
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 2))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 20))
+POOL = psycopg2.pool.ThreadedConnectionPool(
+    DB_POOL_MIN, DB_POOL_MAX,
+    connection_factory=PreparingConnection,
+    **DB_CONFIG
+)
+atexit.register(POOL.closeall)
+
+# ThreadedConnectionPool raises PoolError the moment it is exhausted; under
+# gevent a worker can have far more requests in flight than DB_POOL_MAX, so
+# checkouts wait on this semaphore (up to DB_POOL_TIMEOUT seconds) instead
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+_pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+
 # JIRA configuration
 JIRA_SITE_URL = os.getenv('JIRA_SITE_URL', 'https://yoursite.atlassian.net')
 JIRA_EMAIL = os.getenv('JIRA_EMAIL')
 JIRA_API_TOKEN = os.getenv('JIRA_API_TOKEN')
 JIRA_CLOUD_ID = os.getenv('JIRA_CLOUD_ID')
 
+# Shared JIRA session keeps HTTPS connections to Atlassian alive between calls
+JIRA_SESSION = requests.Session()
+JIRA_SESSION.auth = HTTPBasicAuth(JIRA_EMAIL, JIRA_API_TOKEN)
+JIRA_SESSION.headers.update({'Accept': 'application/json'})
+# JIRA search is a read-only POST, so it is safe to retry alongside GET
+JIRA_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.2, allowed_methods=frozenset({'GET', 'POST'}))
+))
+
+# Shared n8n session; webhook POSTs are not idempotent, so only connection
+# failures (request never sent) are retried
+N8N_SESSION = requests.Session()
+_n8n_adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.2))
+N8N_SESSION.mount('https://', _n8n_adapter)
+N8N_SESSION.mount('http://', _n8n_adapter)
+
+# Short-lived caches for JIRA responses, keyed by JQL and issue key
+_jira_search_cache = TTLCache(maxsize=128, ttl=30)
+_jira_issue_cache = TTLCache(maxsize=512, ttl=60)
+_jira_cache_lock = threading.Lock()
+
 # Upload configuration
 UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'static/uploads')
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'webp'})
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_CHUNK_SIZE = 64 * 1024  # 64KB read from the request stream at a time
+
+# mkstemp creates files as 0600; uploads get the mode open() would have
+# given them (0666 minus the umask) so a web server can serve them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+UPLOAD_FILE_MODE = 0o666 & ~_UMASK
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
+# Number of listings per page / API response
+LISTINGS_PER_PAGE = 50
+# Highest ?page= honoured; keeps the OFFSET well inside bigint. Pages past
+# the last one just render empty.
+MAX_LISTINGS_PAGE = 1_000_000
+
+# Listing columns update_listing_field may change (see the update_listing statement)
+EDITABLE_LISTING_FIELDS = frozenset({
+    'title', 'jira_issue_key', 'status', 'condition', 'measurements',
+    'description', 'list_price', 'sold_price'
+})
+
+# Status badge mapping
+STATUS_BADGES = {
+    'draft': 'badge-secondary',
+    'researching': 'badge-info',
+    'ready': 'badge-success',
+    'listed': 'badge-primary',
+    'sold': 'badge-warning'
+}
+
+# Listings page queries. Listings and status counts come back in one
+# round-trip: the counts are joined onto every listing row, and a single
+# row with NULL listing columns is returned when nothing matches the filter.
+_SQL_LIST_TEMPLATE = """
+    WITH counts AS (
+        SELECT json_object_agg(status, count) FILTER (WHERE status IS NOT NULL) AS status_counts,
+               COALESCE(SUM(count), 0)::int AS total_count
+        FROM (
+            SELECT status, COUNT(*) as count
+            FROM craigslist_listings
+            GROUP BY status
+        ) s
+    )
+    SELECT l.*, counts.status_counts, counts.total_count
+    FROM counts
+    LEFT JOIN (
+        SELECT id, jira_issue_key, title, suggested_price, status,
+               condition, created_at, updated_at,
+               list_price, sold_price, listed_at, sold_at
+        FROM craigslist_listings
+        {where}
+        ORDER BY created_at DESC, id DESC
+        LIMIT {limit} OFFSET {offset}
+    ) l ON true
+    ORDER BY l.created_at DESC, l.id DESC
+"""
+
+# Hot statements, prepared once per pooled connection so Postgres keeps the
+# parsed plan; views run them with EXECUTE name (params)
+PREPARED_STATEMENTS = {
+    'listings_all': _SQL_LIST_TEMPLATE.format(where='', limit='$1', offset='$2'),
+    'listings_by_status': _SQL_LIST_TEMPLATE.format(
+        where='WHERE status = $1', limit='$2', offset='$3'
+    ),
+    'listing_detail': """
+        SELECT id, jira_issue_key, title, description, category,
+               price_min, price_max, suggested_price, condition,
+               measurements, image_paths, status,
+               created_at, updated_at, listed_at, sold_at,
+               list_price, sold_price
+        FROM craigslist_listings
+        WHERE id = $1
+    """,
+    'listing_sources': """
+        SELECT id, title, url, price, location, posted_date,
+               description, condition, measurements, image_url, scraped_at
+        FROM craigslist_sources
+        WHERE listing_id = $1
+        ORDER BY price ASC NULLS LAST
+    """,
+    # Pricing kept in sync with the sources by the sources_price_sync triggers
+    'listing_pricing': """
+        SELECT (SELECT COUNT(*) FROM craigslist_sources WHERE listing_id = $1 AND price IS NOT NULL) AS source_count,
+               price_min AS min_price, price_max AS max_price, suggested_price
+        FROM craigslist_listings
+        WHERE id = $1
+    """,
+    # $1 is a JSON patch; only keys present in it are written, so an explicit
+    # null still clears a column. Moving to listed/sold stamps the timestamp.
+    'update_listing': """
+        UPDATE craigslist_listings l
+        SET title = CASE WHEN patch.doc ? 'title' THEN p.title ELSE l.title END,
+            jira_issue_key = CASE WHEN patch.doc ? 'jira_issue_key' THEN p.jira_issue_key ELSE l.jira_issue_key END,
+            status = CASE WHEN patch.doc ? 'status' THEN p.status ELSE l.status END,
+            condition = CASE WHEN patch.doc ? 'condition' THEN p.condition ELSE l.condition END,
+            measurements = CASE WHEN patch.doc ? 'measurements' THEN p.measurements ELSE l.measurements END,
+            description = CASE WHEN patch.doc ? 'description' THEN p.description ELSE l.description END,
+            list_price = CASE WHEN patch.doc ? 'list_price' THEN p.list_price ELSE l.list_price END,
+            sold_price = CASE WHEN patch.doc ? 'sold_price' THEN p.sold_price ELSE l.sold_price END,
+            listed_at = CASE WHEN p.status = 'listed' THEN CURRENT_TIMESTAMP ELSE l.listed_at END,
+            sold_at = CASE WHEN p.status = 'sold' THEN CURRENT_TIMESTAMP ELSE l.sold_at END,
+            updated_at = CURRENT_TIMESTAMP
+        FROM (SELECT $1::jsonb AS doc) patch,
+             jsonb_populate_record(NULL::craigslist_listings, patch.doc) p
+        WHERE l.id = $2
+        RETURNING l.id
+    """,
+}
+
 # Create upload folder if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Bounded pool for fire-and-forget n8n webhook calls
+RESEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='n8n')
+RESEARCH_MAX_RETRIES = 3
+
+# Pool for long-running jobs (e.g. Craigslist scrapes) started by a request
+BACKGROUND_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix='background')
+
+# Background scrape progress is kept in the scrape_tasks table so any
+# gunicorn worker can stream it; the status stream re-reads the row every
+# SCRAPE_STATUS_POLL_INTERVAL seconds and gives up after SCRAPE_TASK_TTL
+# seconds, when the row also becomes eligible for cleanup.
+SCRAPE_STATUS_POLL_INTERVAL = 1
+SCRAPE_TASK_TTL = 600
+
 def trigger_n8n_research(listing_id):
-    """Trigger n8n workflow to research a listing"""
+    """
+    Trigger n8n workflow to research a listing
+
+    Returns (outcome, reason) where outcome is 'ok', 'retry' or 'failed'.
+    The webhook POST is not idempotent, so 'retry' is only reported when
+    the request never reached n8n (connection error) or n8n asked for a
+    retry (429 / 5xx); 4xx responses and read timeouts are 'failed'.
+    """
     webhook_url = os.getenv('N8N_WEBHOOK_URL')
     if not webhook_url:
-        return False
+        return 'failed', 'N8N_WEBHOOK_URL not set'
     
     try:
-        response = requests.post(
+        response = N8N_SESSION.post(
             webhook_url,
             json={'listing_id': listing_id},
             timeout=5
         )
-        return response.status_code == 200
+    except requests.exceptions.ConnectTimeout as e:
+        return 'retry', f"connect timeout: {e}"
+    except requests.exceptions.Timeout as e:
+        # The request may already be running in n8n
+        return 'failed', f"read timeout: {e}"
+    except requests.exceptions.ConnectionError as e:
+        return 'retry', f"connection error: {e}"
     except requests.exceptions.RequestException as e:
-        print(f"n8n webhook error: {e}")
+        return 'failed', f"request error: {e}"
+
+    status = response.status_code
+    if 200 <= status < 300:
+        return 'ok', f"HTTP {status}"
+    if status == 429 or status >= 500:
+        return 'retry', f"HTTP {status}"
+    return 'failed', f"HTTP {status}"
+
+def research_task(listing_id, max_retries=RESEARCH_MAX_RETRIES):
+    """
+    Trigger n8n research for a listing, retrying with exponential backoff
+
+    Runs on RESEARCH_EXECUTOR; a retryable webhook failure (see
+    trigger_n8n_research) is retried up to max_retries times, waiting
+    1s, 2s, 4s... between attempts.
+    """
+    if not os.getenv('N8N_WEBHOOK_URL'):
         return False
+    
+    for attempt in range(max_retries + 1):
+        outcome, reason = trigger_n8n_research(listing_id)
+        if outcome == 'ok':
+            return True
+        if outcome == 'failed':
+            print(f"n8n research for listing #{listing_id} failed ({reason}), not retrying")
+            return False
+        if attempt < max_retries:
+            delay = 2 ** attempt
+            print(f"n8n research for listing #{listing_id} failed ({reason}), retrying in {delay}s")
+            time.sleep(delay)
+    
+    print(f"n8n research for listing #{listing_id} failed after {max_retries + 1} attempts ({reason})")
+    return False
+
+def prepare_statements(conn):
+    """PREPARE the hot statements on a connection that has not seen them yet"""
+    with conn.cursor() as cur:
+        for name, statement in PREPARED_STATEMENTS.items():
+            cur.execute(f"PREPARE {name} AS {statement}")
+    conn.commit()
+    conn.prepared = True
 
 def get_db_connection():
-    """Create database connection"""
+    """
+    Check out a database connection from the pool
+
+    Waits up to DB_POOL_TIMEOUT seconds for a free connection instead of
+    failing as soon as every pooled connection is in use.
+    """
+    if not _pool_slots.acquire(timeout=DB_POOL_TIMEOUT):
+        print(f"Database pool exhausted: no connection free after {DB_POOL_TIMEOUT}s")
+        raise psycopg2.pool.PoolError("connection pool exhausted")
+    
     try:
-        return psycopg2.connect(**DB_CONFIG)
+        conn = POOL.getconn()
     except psycopg2.Error as e:
+        _pool_slots.release()
         print(f"Database connection error: {e}")
         raise
+    
+    if not conn.prepared:
+        try:
+            prepare_statements(conn)
+        except psycopg2.Error as e:
+            print(f"Error preparing statements: {e}")
+            # A failed rollback leaves the connection unusable, so close it
+            # instead; either way the slot is freed
+            close = not rollback_quietly(conn)
+            release_db_connection(conn, close=close)
+            raise
+    return conn
+
+def rollback_quietly(conn):
+    """Roll back conn, returning False instead of raising if that fails"""
+    try:
+        conn.rollback()
+        return True
+    except psycopg2.Error as e:
+        print(f"Rollback failed: {e}")
+        return False
+
+def release_db_connection(conn, close=False):
+    """Return a connection to the pool and free its checkout slot"""
+    try:
+        POOL.putconn(conn, close=close)
+    finally:
+        _pool_slots.release()
+
+@contextmanager
+def db_cursor(cursor_factory=psycopg2.extras.RealDictCursor, name=None):
+    """
+    Yield a cursor on a pooled connection.
+
+    Commits on success, rolls back on error and always returns the
+    connection to the pool. Rows are dicts by default; pass another
+    cursor_factory (or None for plain tuples) on hot list views. Pass a
+    name to get a server-side cursor that fetches rows in batches while
+    it is iterated.
+    """
+    conn = get_db_connection()
+    close = False
+    try:
+        with conn.cursor(name=name, cursor_factory=cursor_factory) as cur:
+            yield cur
+        conn.commit()
+    except Exception:
+        # Keep the original error; a connection that cannot roll back is
+        # closed rather than handed to the next caller
+        close = not rollback_quietly(conn)
+        raise
+    finally:
+        release_db_connection(conn, close=close)
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in ALLOWED_EXTENSIONS
+
+class FormFieldTarget(ValueTarget):
+    """ValueTarget that remembers whether its part was in the body at all"""
+
+    def __init__(self):
+        super().__init__()
+        self.received = False
+
+    def on_start(self):
+        super().on_start()
+        self.received = True
+
+    def text(self):
+        """Decoded value; '' for a blank field, None if the part never arrived"""
+        return self.value.decode('utf-8') if self.received else None
+
+class ImageUploadTarget(BaseTarget):
+    """Streaming form target that writes each allowed image part straight to disk.
+
+    Files are content-addressed by SHA-256 (uploads/ab/abcdef....jpg), so
+    re-uploading the same image reuses the existing file instead of writing
+    another copy.
+    """
+
+    def __init__(self, upload_folder):
+        super().__init__()
+        self.upload_folder = upload_folder
+        self.image_paths = []
+        self.created_files = []
+        self._file = None
+        self._temp_path = None
+        self._ext = None
+        self._hash = None
+
+    def on_start(self):
+        if not self.multipart_filename or not allowed_file(self.multipart_filename):
+            self._file = None
+            return
+        self._ext = self.multipart_filename.rpartition('.')[2].lower()
+        self._hash = hashlib.sha256()
+        fd, self._temp_path = tempfile.mkstemp(dir=self.upload_folder, suffix='.part')
+        self._file = os.fdopen(fd, 'wb')
+
+    def on_data_received(self, chunk):
+        if self._file:
+            self._hash.update(chunk)
+            self._file.write(chunk)
+
+    def on_finish(self):
+        if not self._file:
+            return
+        self._file.close()
+        self._file = None
+
+        digest = self._hash.hexdigest()
+        relative = f"{digest[:2]}/{digest}.{self._ext}"
+        final_path = os.path.join(self.upload_folder, relative)
+        if os.path.exists(final_path):
+            # Same bytes already on disk; drop the temp copy
+            os.remove(self._temp_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.chmod(self._temp_path, UPLOAD_FILE_MODE)
+            os.replace(self._temp_path, final_path)
+            self.created_files.append(final_path)
+        self._temp_path = None
+
+        # Store relative path from static folder
+        image_path = f"uploads/{relative}"
+        if image_path not in self.image_paths:
+            self.image_paths.append(image_path)
+
+    def discard(self):
+        """Close and delete the temp file of a part that never finished"""
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self._temp_path:
+            try:
+                os.remove(self._temp_path)
+            except OSError as e:
+                print(f"Could not delete temp upload {self._temp_path}: {e}")
+            self._temp_path = None
+
+    def remove_created(self):
+        """
+        Delete the files this upload moved into place, for a failed request
 
-def search_jira_issues(jql):
-    """Search JIRA issues using JQL"""
+        Files that were already on disk are left alone. A concurrent upload
+        that reused one of these files in the meantime loses it; that needs
+        identical bytes posted at the same moment, and is accepted.
+        """
+        for path in self.created_files:
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"Could not delete upload {path}: {e}")
+        self.created_files = []
+
+def search_jira_issues(jql, refresh=False):
+    """Search JIRA issues using JQL; refresh=True bypasses the cache"""
     if not JIRA_EMAIL or not JIRA_API_TOKEN:
         return None
     
+    if not refresh:
+        with _jira_cache_lock:
+            cached = _jira_search_cache.get(jql)
+        if cached is not None:
+            return cached
+    
     url = f"{JIRA_SITE_URL}/rest/api/3/search/jql"
-    auth = HTTPBasicAuth(JIRA_EMAIL, JIRA_API_TOKEN)
-    headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
     
     payload = {
         "jql": jql,
@@ -97,38 +542,59 @@ def search_jira_issues(jql):
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload, auth=auth)
+        response = JIRA_SESSION.post(url, json=payload, timeout=10)
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        with _jira_cache_lock:
+            _jira_search_cache[jql] = data
+        return data
     except requests.exceptions.RequestException as e:
         print(f"JIRA API error: {e}")
         if hasattr(e, 'response') and e.response is not None:
             print(f"Response: {e.response.text}")
         return None
 
-def get_jira_issue(issue_key):
-    """Get a specific JIRA issue by key"""
+def get_jira_issue(issue_key, refresh=False):
+    """Get a specific JIRA issue by key; refresh=True bypasses the cache"""
     if not JIRA_EMAIL or not JIRA_API_TOKEN:
         return None
     
+    if not refresh:
+        with _jira_cache_lock:
+            cached = _jira_issue_cache.get(issue_key)
+        if cached is not None:
+            return cached
+    
     url = f"{JIRA_SITE_URL}/rest/api/3/issue/{issue_key}"
-    auth = HTTPBasicAuth(JIRA_EMAIL, JIRA_API_TOKEN)
-    headers = {
-        "Accept": "application/json"
-    }
     
     try:
-        response = requests.get(url, headers=headers, auth=auth)
+        response = JIRA_SESSION.get(url, timeout=10)
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        # Flatten the ADF description once per fetch rather than on every view
+        data['description_text'] = _adf_text(data.get('fields', {}).get('description'))
+        with _jira_cache_lock:
+            _jira_issue_cache[issue_key] = data
+        return data
     except requests.exceptions.RequestException as e:
         print(f"JIRA API error: {e}")
         return None
 
+def _adf_text(adf):
+    """Plain text of a JIRA description in Atlassian Document Format, one line per block"""
+    if not isinstance(adf, dict):
+        return ''
+    return '\n'.join(
+        ''.join(node.get('text', '') for node in block.get('content', []) if node.get('type') == 'text')
+        for block in adf.get('content', [])
+    )
+
+# Source URLs and prices repeat across rows and renders, so the filters
+# below memoize on the raw value
 @app.template_filter('domain_name')
+@functools.lru_cache(maxsize=4096)
 def domain_name_filter(url):
     try:
-        from urllib.parse import urlparse
         domain = urlparse(url).netloc
         domain = domain.replace('www.', '')
         
@@ -148,6 +614,7 @@ def domain_name_filter(url):
         return 'Source'
 
 @app.template_filter('currency')
+@functools.lru_cache(maxsize=4096)
 def currency_filter(amount):
     """Format number as currency"""
     try:
@@ -178,96 +645,52 @@ def inject_globals():
 def listings_page():
     """Main listings page with filtering"""
     status_filter = request.args.get('status', 'all')
+    page = min(max(request.args.get('page', 1, type=int), 1), MAX_LISTINGS_PAGE)
+    offset = (page - 1) * LISTINGS_PER_PAGE
     
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    
-    # Get listings based on filter
-    if status_filter == 'all':
-        cur.execute("""
-            SELECT id, jira_issue_key, title, suggested_price, status, 
-                   condition, created_at, updated_at,
-                   list_price, sold_price, listed_at, sold_at
-            FROM craigslist_listings 
-            ORDER BY created_at DESC
-        """)
-    else:
-        cur.execute("""
-            SELECT id, jira_issue_key, title, suggested_price, status, 
-                   condition, created_at, updated_at,
-                   list_price, sold_price, listed_at, sold_at
-            FROM craigslist_listings 
-            WHERE status = %s
-            ORDER BY created_at DESC
-        """, (status_filter,))
-    
-    listings = cur.fetchall()
-    
-    # Get status counts
-    cur.execute("""
-        SELECT status, COUNT(*) as count
-        FROM craigslist_listings 
-        GROUP BY status
-    """)
-    status_counts = {row['status']: row['count'] for row in cur.fetchall()}
-    
-    cur.close()
-    conn.close()
+    # Named tuples are cheaper than dicts per row; Jinja reads listing.title either way
+    with db_cursor(cursor_factory=psycopg2.extras.NamedTupleCursor) as cur:
+        if status_filter == 'all':
+            cur.execute("EXECUTE listings_all (%s, %s)", (LISTINGS_PER_PAGE, offset))
+        else:
+            cur.execute(
+                "EXECUTE listings_by_status (%s, %s, %s)",
+                (status_filter, LISTINGS_PER_PAGE, offset)
+            )
+        
+        rows = cur.fetchall()
     
-    total_count = sum(status_counts.values())
+    status_counts = rows[0].status_counts or {}
+    total_count = rows[0].total_count
+    listings = [row for row in rows if row.id is not None]
     
-    # Status badge mapping
-    status_badges = {
-        'draft': 'badge-secondary',
-        'researching': 'badge-info',
-        'ready': 'badge-success',
-        'listed': 'badge-primary',
-        'sold': 'badge-warning'
-    }
+    filtered_count = total_count if status_filter == 'all' else status_counts.get(status_filter, 0)
+    total_pages = max(math.ceil(filtered_count / LISTINGS_PER_PAGE), 1)
     
     return render_template('listings.html',
                          listings=listings,
                          status_counts=status_counts,
                          total_count=total_count,
                          current_filter=status_filter,
-                         status_badges=status_badges)
+                         status_badges=STATUS_BADGES,
+                         page=page,
+                         total_pages=total_pages)
 
 @app.route('/listing/<int:listing_id>')
 def listing_detail(listing_id):
     """Detailed view of a single listing"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-    cur.execute("""
-        SELECT id, jira_issue_key, title, description, category,
-               price_min, price_max, suggested_price, condition,
-               measurements, image_paths, status,
-               created_at, updated_at, listed_at, sold_at,
-               list_price, sold_price
-        FROM craigslist_listings
-        WHERE id = %s
-    """, (listing_id,))
-
-    listing = cur.fetchone()
+    with db_cursor() as cur:
+        cur.execute("EXECUTE listing_detail (%s)", (listing_id,))
 
-    if not listing:
-        cur.close()
-        conn.close()
-        return "Listing not found", 404
+        listing = cur.fetchone()
 
-    # Get scraped sources
-    cur.execute("""
-        SELECT id, title, url, price, location, posted_date,
-               description, condition, measurements, image_url, scraped_at
-        FROM craigslist_sources
-        WHERE listing_id = %s
-        ORDER BY price ASC NULLS LAST
-    """, (listing_id,))
+        if not listing:
+            return "Listing not found", 404
 
-    sources = cur.fetchall()
+        # Get scraped sources
+        cur.execute("EXECUTE listing_sources (%s)", (listing_id,))
 
-    cur.close()
-    conn.close()
+        sources = cur.fetchall()
 
     # image_paths is now a native array, no need to parse
     listing['images'] = listing['image_paths'] if listing['image_paths'] else []
@@ -280,62 +703,17 @@ def update_listing_field(listing_id):
     """Update specific fields of a listing"""
     data = request.json
 
-    conn = None
-    cur = None
-
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-        # Check if listing exists
-        cur.execute("SELECT id FROM craigslist_listings WHERE id = %s", (listing_id,))
-        if not cur.fetchone():
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
-            return jsonify({'success': False, 'error': 'Listing not found'}), 404
+        # Only allowed fields go into the patch for the prepared UPDATE
+        patch = {field: data[field] for field in data.keys() & EDITABLE_LISTING_FIELDS}
 
-        # Build dynamic UPDATE query for allowed fields
-        allowed_fields = ['title', 'jira_issue_key', 'status', 'condition', 'measurements', 'description', 'list_price', 'sold_price']
-        updates = []
-        values = []
-
-        for field in allowed_fields:
-            if field in data:
-                updates.append(f"{field} = %s")
-                values.append(data[field])
-                
-                if field == "status" and data[field] == "listed":
-                    updates.append("listed_at = CURRENT_TIMESTAMP")
-                elif field == "status" and data[field] == "sold":
-                    updates.append("sold_at = CURRENT_TIMESTAMP")
-
-        if not updates:
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
+        if not patch:
             return jsonify({'success': False, 'error': 'No valid fields to update'}), 400
 
-        # Add updated_at timestamp
-        updates.append("updated_at = CURRENT_TIMESTAMP")
-
-        # Add listing_id for WHERE clause
-        values.append(listing_id)
-
-        # Execute update
-        query = f"""
-            UPDATE craigslist_listings
-            SET {', '.join(updates)}
-            WHERE id = %s
-        """
-
-        cur.execute(query, values)
-        conn.commit()
-
-        cur.close()
-        conn.close()
+        with db_cursor() as cur:
+            cur.execute("EXECUTE update_listing (%s, %s)", (psycopg2.extras.Json(patch), listing_id))
+            if not cur.fetchone():
+                return jsonify({'success': False, 'error': 'Listing not found'}), 404
 
         return jsonify({'success': True, 'message': 'Listing updated successfully'})
 
@@ -345,15 +723,43 @@ def update_listing_field(listing_id):
         print(f"Error updating listing: {e}")
         print(error_trace)
 
-        if conn:
-            conn.rollback()
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def remove_upload_file(image_path):
+    """Delete an uploaded file under static/, logging rather than raising on failure"""
+    try:
+        file_path = os.path.join('static', image_path)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            print(f"Deleted file: {file_path}")
+    except Exception as e:
+        print(f"Could not delete file {image_path}: {e}")
+
+def remove_unreferenced_upload(image_path):
+    """
+    Delete an uploaded file unless a listing points at it again
+
+    Uploads are content-addressed, so by the time this runs another listing
+    may have been saved with the same file; check again right before
+    unlinking. An upload that reused the file but has not committed its
+    listing yet is not visible here, and would be left pointing at a
+    missing file. That window runs from the upload finishing to its INSERT
+    committing, and needs the same image posted at that moment.
+    """
+    try:
+        with db_cursor() as cur:
+            cur.execute("""
+                SELECT EXISTS (
+                    SELECT 1 FROM craigslist_listings WHERE %s = ANY(image_paths)
+                ) AS shared
+            """, (image_path,))
+            if cur.fetchone()['shared']:
+                return
+    except Exception as e:
+        print(f"Could not check whether {image_path} is still used: {e}")
+        return
+    remove_upload_file(image_path)
+
 @app.route('/listing/<int:listing_id>/image/delete', methods=['POST'])
 def delete_listing_image(listing_id):
     """Delete an image from a listing"""
@@ -363,68 +769,41 @@ def delete_listing_image(listing_id):
     if not image_path:
         return jsonify({'success': False, 'error': 'No image path provided'}), 400
 
-    conn = None
-    cur = None
-
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-        # Get current listing
-        cur.execute("""
-            SELECT id, image_paths FROM craigslist_listings
-            WHERE id = %s
-        """, (listing_id,))
-
-        listing = cur.fetchone()
-
-        if not listing:
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
-            return jsonify({'success': False, 'error': 'Listing not found'}), 404
-
-        # Remove image_path from array
-        current_images = listing['image_paths'] or []
-
-        if image_path not in current_images:
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
-            return jsonify({'success': False, 'error': 'Image not found in listing'}), 404
+        with db_cursor() as cur:
+            # Remove the path in the same statement that checks it is there
+            cur.execute("""
+                UPDATE craigslist_listings
+                SET image_paths = array_remove(image_paths, %s),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND %s = ANY(image_paths)
+                RETURNING cardinality(image_paths) AS remaining_count
+            """, (image_path, listing_id, image_path))
 
-        # Remove from array
-        new_images = [img for img in current_images if img != image_path]
+            updated = cur.fetchone()
 
-        # Update database
-        cur.execute("""
-            UPDATE craigslist_listings
-            SET image_paths = %s,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-        """, (new_images, listing_id))
+            if not updated:
+                return jsonify({'success': False, 'error': 'Listing or image not found'}), 404
 
-        conn.commit()
+            remaining_count = updated['remaining_count']
 
-        # Try to delete physical file (optional - may want to keep for recovery)
-        try:
-            file_path = os.path.join('static', image_path)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                print(f"Deleted file: {file_path}")
-        except Exception as e:
-            print(f"Could not delete file {image_path}: {e}")
-            # Don't fail the request if file deletion fails
+            # Uploads are content-addressed, so another listing may share the file
+            cur.execute("""
+                SELECT EXISTS (
+                    SELECT 1 FROM craigslist_listings WHERE %s = ANY(image_paths)
+                ) AS shared
+            """, (image_path,))
+            shared = cur.fetchone()['shared']
 
-        cur.close()
-        conn.close()
+        # Delete the physical file off the request path (optional - may want
+        # to keep for recovery)
+        if not shared:
+            BACKGROUND_EXECUTOR.submit(remove_unreferenced_upload, image_path)
 
         return jsonify({
             'success': True,
-            'message': f'Image deleted successfully. {len(new_images)} image(s) remaining.',
-            'remaining_count': len(new_images)
+            'message': f'Image deleted successfully. {remaining_count} image(s) remaining.',
+            'remaining_count': remaining_count
         }), 200
 
     except Exception as e:
@@ -433,13 +812,6 @@ def delete_listing_image(listing_id):
         print(f"Error deleting image: {e}")
         print(error_trace)
 
-        if conn:
-            conn.rollback()
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/listing/<int:listing_id>/source/add', methods=['POST'])
@@ -451,119 +823,80 @@ def add_source_to_listing(listing_id):
     if not url:
         return jsonify({'success': False, 'error': 'URL is required'}), 400
     
-    conn = None
-    cur = None
-    
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        # Verify listing exists
-        cur.execute("SELECT id, title FROM craigslist_listings WHERE id = %s", (listing_id,))
-        listing = cur.fetchone()
-        
-        if not listing:
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
-            return jsonify({'success': False, 'error': 'Listing not found'}), 404
-        
-        # Extract fields from request (all optional except URL)
-        title = data.get('title', 'Untitled Source')
-        price = data.get('price')
-        location = data.get('location')
-        posted_date = data.get('posted_date')
-        description = data.get('description')
-        condition = data.get('condition')
-        measurements = data.get('measurements')
-        image_url = data.get('image_url')
-        
-        # Convert price to decimal if it's a string
-        if price and isinstance(price, str):
-            try:
-                # Remove $ and commas
-                price = price.replace('$', '').replace(',', '').strip()
-                price = float(price)
-            except ValueError:
-                price = None
-        
-        print(f"\nAdding source to listing #{listing_id}:")
-        print(f"  URL: {url}")
-        print(f"  Title: {title}")
-        print(f"  Price: ${price}" if price else "  Price: None")
-        
-        # Insert the source
-        cur.execute("""
-            INSERT INTO craigslist_sources
-            (listing_id, title, url, price, location, posted_date,
-             description, condition, measurements, image_url)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (listing_id, url) DO UPDATE SET
-                title = EXCLUDED.title,
-                price = EXCLUDED.price,
-                location = EXCLUDED.location,
-                posted_date = EXCLUDED.posted_date,
-                description = EXCLUDED.description,
-                condition = EXCLUDED.condition,
-                measurements = EXCLUDED.measurements,
-                image_url = EXCLUDED.image_url,
-                scraped_at = CURRENT_TIMESTAMP
-            RETURNING id
-        """, (
-            listing_id,
-            title,
-            url,
-            price,
-            location,
-            posted_date,
-            description,
-            condition,
-            measurements,
-            image_url
-        ))
-        
-        result = cur.fetchone()
-        source_id = result['id']
-        
-        # Recalculate price statistics
-        cur.execute("""
-            SELECT 
-                COUNT(*) as source_count,
-                MIN(price) as min_price,
-                MAX(price) as max_price,
-                AVG(price) as avg_price
-            FROM craigslist_sources
-            WHERE listing_id = %s AND price IS NOT NULL
-        """, (listing_id,))
-        
-        stats = cur.fetchone()
-        
-        # Update listing with new price info
-        if stats and stats['source_count'] > 0:
+        with db_cursor() as cur:
+            # Verify listing exists
+            cur.execute("SELECT id, title FROM craigslist_listings WHERE id = %s", (listing_id,))
+            listing = cur.fetchone()
+            
+            if not listing:
+                return jsonify({'success': False, 'error': 'Listing not found'}), 404
+            
+            # Extract fields from request (all optional except URL)
+            title = data.get('title', 'Untitled Source')
+            price = data.get('price')
+            location = data.get('location')
+            posted_date = data.get('posted_date')
+            description = data.get('description')
+            condition = data.get('condition')
+            measurements = data.get('measurements')
+            image_url = data.get('image_url')
+            
+            # Convert price to decimal if it's a string
+            if price and isinstance(price, str):
+                try:
+                    # Remove $ and commas
+                    price = price.replace('$', '').replace(',', '').strip()
+                    price = float(price)
+                except ValueError:
+                    price = None
+            
+            print(f"\nAdding source to listing #{listing_id}:")
+            print(f"  URL: {url}")
+            print(f"  Title: {title}")
+            print(f"  Price: ${price}" if price else "  Price: None")
+            
+            # The sources_price_sync triggers reprice the listing
             cur.execute("""
-                UPDATE craigslist_listings 
-                SET price_min = %s,
-                    price_max = %s,
-                    suggested_price = %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (
-                stats['min_price'],
-                stats['max_price'],
-                round(float(stats['avg_price']), 2) if stats['avg_price'] else None,
-                listing_id
-            ))
-        
-        conn.commit()
+                INSERT INTO craigslist_sources
+                (listing_id, title, url, price, location, posted_date,
+                 description, condition, measurements, image_url)
+                VALUES (%(listing_id)s, %(title)s, %(url)s, %(price)s, %(location)s,
+                        %(posted_date)s, %(description)s, %(condition)s,
+                        %(measurements)s, %(image_url)s)
+                ON CONFLICT (listing_id, url) DO UPDATE SET
+                    title = EXCLUDED.title,
+                    price = EXCLUDED.price,
+                    location = EXCLUDED.location,
+                    posted_date = EXCLUDED.posted_date,
+                    description = EXCLUDED.description,
+                    condition = EXCLUDED.condition,
+                    measurements = EXCLUDED.measurements,
+                    image_url = EXCLUDED.image_url,
+                    scraped_at = CURRENT_TIMESTAMP
+                RETURNING id
+            """, {
+                'listing_id': listing_id,
+                'title': title,
+                'url': url,
+                'price': price,
+                'location': location,
+                'posted_date': posted_date,
+                'description': description,
+                'condition': condition,
+                'measurements': measurements,
+                'image_url': image_url
+            })
+            
+            source_id = cur.fetchone()['id']
+            
+            cur.execute("EXECUTE listing_pricing (%s)", (listing_id,))
+            stats = cur.fetchone()
         
         print(f"  ✓ Source added with ID: {source_id}")
         if stats and stats['source_count'] > 0:
             print(f"  Updated pricing: ${stats['min_price']:.2f} - ${stats['max_price']:.2f}")
         
-        cur.close()
-        conn.close()
-        
         return jsonify({
             'success': True,
             'message': 'Source added successfully',
@@ -572,13 +905,6 @@ def add_source_to_listing(listing_id):
         }), 201
         
     except psycopg2.IntegrityError as e:
-        if conn:
-            conn.rollback()
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        
         return jsonify({
             'success': False,
             'error': 'This URL already exists for this listing'
@@ -590,45 +916,125 @@ def add_source_to_listing(listing_id):
         print(f"Error adding source: {e}")
         print(error_trace)
         
-        if conn:
-            conn.rollback()
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/listing/<int:listing_id>/scrape-craigslist', methods=['POST'])
 def scrape_craigslist_sources(listing_id):
-    """Scrape Craigslist for similar listings"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    """Queue a Craigslist scrape for similar listings"""
+    with db_cursor() as cur:
+        # Get listing details
+        cur.execute("SELECT id, title, status FROM craigslist_listings WHERE id = %s", (listing_id,))
+        listing = cur.fetchone()
 
-    # Get listing details
-    cur.execute("SELECT id, title, status FROM craigslist_listings WHERE id = %s", (listing_id,))
-    listing = cur.fetchone()
+        if not listing:
+            return jsonify({'success': False, 'error': 'Listing not found'}), 404
 
-    if not listing:
-        cur.close()
-        conn.close()
-        return jsonify({'success': False, 'error': 'Listing not found'}), 404
+        # Update status to researching
+        cur.execute("""
+            UPDATE craigslist_listings
+            SET status = 'researching', updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (listing_id,))
 
-    # Update status to researching
-    cur.execute("""
-        UPDATE craigslist_listings
-        SET status = 'researching', updated_at = CURRENT_TIMESTAMP
-        WHERE id = %s
-    """, (listing_id,))
-    conn.commit()
+        # Scraping takes many seconds; run it in the background and stream
+        # progress to the page over /scrape-status/<task_id>. The task row
+        # commits with the status change, before anyone can ask for it.
+        task_id = uuid.uuid4().hex
+        cur.execute("""
+            DELETE FROM scrape_tasks
+            WHERE updated_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+        """, (SCRAPE_TASK_TTL,))
+        cur.execute("""
+            INSERT INTO scrape_tasks (id, listing_id, event)
+            VALUES (%s, %s, '{"stage": "queued"}')
+        """, (task_id, listing_id))
+
+    BACKGROUND_EXECUTOR.submit(run_scrape_task, task_id, listing_id, listing['title'])
+
+    return jsonify({
+        'success': True,
+        'status': 'queued',
+        'message': 'Research started',
+        'task_id': task_id,
+        'status_url': url_for('scrape_status', task_id=task_id)
+    }), 202
+
+@app.route('/scrape-status/<task_id>')
+def scrape_status(task_id):
+    """Stream progress events for a background scrape as Server-Sent Events"""
+    def read_event():
+        with db_cursor(cursor_factory=None) as cur:
+            cur.execute(
+                "SELECT event->>'stage', event::text FROM scrape_tasks WHERE id = %s",
+                (task_id,)
+            )
+            return cur.fetchone()
+
+    if read_event() is None:
+        return jsonify({'success': False, 'error': 'Unknown task'}), 404
+
+    def generate():
+        last_event = None
+        idle = 0
+        deadline = time.monotonic() + SCRAPE_TASK_TTL
+        while time.monotonic() < deadline:
+            row = read_event()
+            if row is None:
+                return
+            stage, event = row
+            if event != last_event:
+                last_event = event
+                idle = 0
+                yield b"data: " + event.encode('utf-8') + b"\n\n"
+                if stage in ('done', 'error'):
+                    return
+            else:
+                idle += SCRAPE_STATUS_POLL_INTERVAL
+                if idle >= 15:
+                    # Comment line keeps proxies from closing an idle stream
+                    idle = 0
+                    yield b": keep-alive\n\n"
+            time.sleep(SCRAPE_STATUS_POLL_INTERVAL)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def run_scrape_task(task_id, listing_id, title):
+    """Run a scrape on BACKGROUND_EXECUTOR, publishing progress for task_id"""
+    def publish(event):
+        try:
+            with db_cursor() as cur:
+                cur.execute("""
+                    UPDATE scrape_tasks
+                    SET event = %s::jsonb, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                """, (orjson.dumps(event, default=_json_default).decode('utf-8'), task_id))
+        except Exception as e:
+            # Progress is best effort; the page still polls the listing
+            print(f"Could not record scrape progress for {task_id}: {e}")
+
+    result = run_craigslist_scrape(listing_id, title, progress=publish)
+    publish({'stage': 'done' if result['success'] else 'error', **result})
 
+def run_craigslist_scrape(listing_id, title, progress=None):
+    """
+    Scrape Craigslist for listings similar to title and save them as sources
+
+    Runs on BACKGROUND_EXECUTOR. Marks the listing 'ready' when done, or
+    back to 'draft' if scraping fails, and returns a summary dict. If given,
+    progress is called with a small event dict as each stage starts.
+    """
+    progress = progress or (lambda event: None)
     try:
-        # Scrape Craigslist (Vermont by default)
+        progress({'stage': 'scraping'})
+        # Scrape Craigslist (Vermont by default). No pooled connection is
+        # held while the scraper waits on the network.
         print(f"\n{'='*60}")
-        print(f"Starting scrape for listing #{listing_id}: {listing['title']}")
+        print(f"Starting scrape for listing #{listing_id}: {title}")
         print(f"{'='*60}\n")
 
-        results = scrape_craigslist(listing['title'], region='vermont', max_results=10)
+        results = scrape_craigslist(title, region='vermont', max_results=10)
+        progress({'stage': 'saving', 'found': len(results)})
 
         print(f"\n{'='*60}")
         print(f"Scraper returned {len(results)} results")
@@ -637,38 +1043,25 @@ def scrape_craigslist_sources(listing_id):
         if not results:
             print("WARNING: No results returned from scraper")
             # Still update status to ready even with no results
-            cur.execute("""
-                UPDATE craigslist_listings
-                SET status = 'ready', updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (listing_id,))
-            conn.commit()
-            cur.close()
-            conn.close()
-            return jsonify({
+            with db_cursor() as cur:
+                cur.execute("""
+                    UPDATE craigslist_listings
+                    SET status = 'ready', updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                """, (listing_id,))
+            return {
                 'success': True,
                 'message': 'No similar listings found',
                 'stats': {'source_count': 0}
-            })
-
-        # Save results to database
-        saved_count = 0
-        errors = []
+            }
 
-        for i, result in enumerate(results, 1):
-            try:
-                print(f"\nSaving result {i}/{len(results)}: {result['title'][:50]}...")
-                print(f"  URL: {result['url']}")
-                print(f"  Price: ${result['price']}")
+        with db_cursor() as cur:
+            # Save results to database
+            saved_count = 0
+            errors = []
 
-                cur.execute("""
-                    INSERT INTO craigslist_sources
-                    (listing_id, title, url, price, location, posted_date,
-                     description, condition, measurements, image_url)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (listing_id, url) DO NOTHING
-                    RETURNING id
-                """, (
+            rows = [
+                (
                     listing_id,
                     result['title'],
                     result['url'],
@@ -679,89 +1072,65 @@ def scrape_craigslist_sources(listing_id):
                     result['condition'],
                     result['measurements'],
                     result['image_url']
-                ))
-
-                inserted = cur.fetchone()
-                if inserted:
-                    print(f"  ✓ Saved with ID: {inserted['id']}")
-                    saved_count += 1
-                else:
-                    print(f"  ⚠ Duplicate (already exists)")
+                )
+                for result in results
+            ]
 
+            # Insert the batch and mark the listing ready in one statement;
+            # the sources_price_sync triggers reprice the listing
+            try:
+                cur.execute("SAVEPOINT save_sources")
+                inserted = psycopg2.extras.execute_values(cur, sql.SQL("""
+                    WITH ins AS (
+                        INSERT INTO craigslist_sources
+                        (listing_id, title, url, price, location, posted_date,
+                         description, condition, measurements, image_url)
+                        VALUES %s
+                        ON CONFLICT (listing_id, url) DO NOTHING
+                        RETURNING id
+                    ),
+                    upd AS (
+                        UPDATE craigslist_listings
+                        SET status = 'ready',
+                            updated_at = CURRENT_TIMESTAMP
+                        WHERE id = {listing_id}
+                    )
+                    SELECT COUNT(*) as saved_count FROM ins
+                """).format(listing_id=sql.Literal(listing_id)), rows, page_size=len(rows), fetch=True)
+                saved_count = inserted[0]['saved_count']
+                cur.execute("EXECUTE listing_pricing (%s)", (listing_id,))
+                stats = dict(cur.fetchone())
             except psycopg2.Error as e:
-                error_msg = f"Error saving source {i}: {e}"
+                error_msg = f"Error saving sources: {e}"
                 print(f"  ✗ {error_msg}")
                 errors.append(error_msg)
-                conn.rollback()  # Rollback this insert but continue
-                continue
-
-        # Commit all successful inserts
-        conn.commit()
-
-        print(f"\n{'='*60}")
-        print(f"Saved {saved_count} out of {len(results)} results")
-        if errors:
-            print(f"Errors encountered: {len(errors)}")
-            for error in errors:
-                print(f"  - {error}")
-        print(f"{'='*60}\n")
-
-        # Calculate price statistics
-        cur.execute("""
-            SELECT
-                COUNT(*) as source_count,
-                MIN(price) as min_price,
-                MAX(price) as max_price,
-                AVG(price) as avg_price
-            FROM craigslist_sources
-            WHERE listing_id = %s AND price IS NOT NULL
-        """, (listing_id,))
-
-        stats = cur.fetchone()
-
-        print(f"Price statistics:")
-        print(f"  Count: {stats['source_count']}")
-        print(f"  Min: ${stats['min_price']}")
-        print(f"  Max: ${stats['max_price']}")
-        print(f"  Avg: ${stats['avg_price']}")
-
-        # Update listing with price info and status
-        if stats and stats['source_count'] > 0:
-            cur.execute("""
-                UPDATE craigslist_listings
-                SET price_min = %s,
-                    price_max = %s,
-                    suggested_price = %s,
-                    status = 'ready',
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (
-                stats['min_price'],
-                stats['max_price'],
-                round(stats['avg_price'], 2) if stats['avg_price'] else None,
-                listing_id
-            ))
-            print(f"\n✓ Updated listing with price range: ${stats['min_price']} - ${stats['max_price']}")
-        else:
-            # No sources with prices found, just mark as ready
-            cur.execute("""
-                UPDATE craigslist_listings
-                SET status = 'ready', updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (listing_id,))
-            print(f"\n⚠ No sources with prices found, marked as ready")
-
-        conn.commit()
-
-        cur.close()
-        conn.close()
-
-        return jsonify({
+                cur.execute("ROLLBACK TO SAVEPOINT save_sources")
+                # Nothing was saved, so pricing is unchanged; still mark ready
+                cur.execute("""
+                    UPDATE craigslist_listings
+                    SET status = 'ready', updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                """, (listing_id,))
+                stats = {'source_count': 0}
+
+            print(f"\n{'='*60}")
+            print(f"Saved {saved_count} out of {len(results)} results")
+            if errors:
+                print(f"Errors encountered: {len(errors)}")
+                for error in errors:
+                    print(f"  - {error}")
+            print(f"{'='*60}\n")
+
+            if stats['source_count'] > 0:
+                print(f"✓ Updated listing with price range: ${stats['min_price']} - ${stats['max_price']}")
+            else:
+                print(f"⚠ No sources with prices found, marked as ready")
+        return {
             'success': True,
             'message': f'Found {saved_count} similar listings',
-            'stats': dict(stats) if stats else {'source_count': 0},
+            'stats': stats,
             'errors': errors if errors else None
-        })
+        }
 
     except Exception as e:
         # Reset status on error
@@ -773,19 +1142,27 @@ def scrape_craigslist_sources(listing_id):
         print(f"{'='*60}\n")
 
         try:
-            cur.execute("""
-                UPDATE craigslist_listings
-                SET status = 'draft', updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (listing_id,))
-            conn.commit()
+            with db_cursor() as cur:
+                cur.execute("""
+                    UPDATE craigslist_listings
+                    SET status = 'draft', updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                """, (listing_id,))
         except:
             pass
 
-        cur.close()
-        conn.close()
+        return {'success': False, 'error': str(e)}
 
-        return jsonify({'success': False, 'error': str(e), 'trace': error_trace}), 500
+def fetch_existing_jira_keys(keys):
+    """Get which of the given JIRA issue keys already have listings"""
+    if not keys:
+        return set()
+    with db_cursor() as cur:
+        cur.execute(
+            "SELECT jira_issue_key FROM craigslist_listings WHERE jira_issue_key = ANY(%s)",
+            (keys,)
+        )
+        return {row['jira_issue_key'] for row in cur.fetchall()}
 
 @app.route('/jira-tasks')
 def jira_tasks():
@@ -798,7 +1175,7 @@ def jira_tasks():
     if custom_jql:
         jql = custom_jql
     
-    issues_data = search_jira_issues(jql)
+    issues_data = search_jira_issues(jql, refresh=request.args.get('refresh') == '1')
     
     if issues_data is None:
         flash('Unable to connect to JIRA. Check your configuration.', 'error')
@@ -807,12 +1184,7 @@ def jira_tasks():
         issues = issues_data.get('issues', [])
     
     # Check which issues already have listings
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute("SELECT jira_issue_key FROM craigslist_listings")
-    existing_keys = {row['jira_issue_key'] for row in cur.fetchall()}
-    cur.close()
-    conn.close()
+    existing_keys = fetch_existing_jira_keys([issue['key'] for issue in issues])
     
     return render_template('jira_tasks.html', 
                          issues=issues, 
@@ -823,49 +1195,71 @@ def jira_tasks():
 def create_listing(issue_key):
     """Create a new listing from a JIRA issue"""
     # Get JIRA issue details
-    issue = get_jira_issue(issue_key)
+    issue = get_jira_issue(issue_key, refresh=request.args.get('refresh') == '1')
     
     if not issue:
         flash(f'Could not find JIRA issue {issue_key}', 'error')
         return redirect(url_for('jira_tasks'))
     
     if request.method == 'POST':
-        # Extract form data
-        title = request.form.get('title')
-        condition = request.form.get('condition')
-        measurements = request.form.get('measurements')
-        category = request.form.get('category')
+        # The streaming parser needs a multipart boundary to work with
+        if request.mimetype != 'multipart/form-data':
+            return 'Expected multipart/form-data', 400
+        
+        # Parse the multipart body as it arrives so uploaded images go
+        # straight to disk instead of being buffered by Werkzeug first
+        parser = StreamingFormDataParser(headers=request.headers)
+        form_fields = {
+            name: FormFieldTarget()
+            for name in ('title', 'condition', 'measurements', 'category')
+        }
+        for name, target in form_fields.items():
+            parser.register(name, target)
+        images = ImageUploadTarget(app.config['UPLOAD_FOLDER'])
+        parser.register('images', images)
         
-        # Handle file uploads
-        uploaded_files = request.files.getlist('images')
-        image_paths = []
+        try:
+            while chunk := request.stream.read(UPLOAD_CHUNK_SIZE):
+                parser.data_received(chunk)
+        except Exception:
+            # Oversized or truncated body: drop the unfinished part and
+            # anything already moved into place
+            images.discard()
+            images.remove_created()
+            raise
         
-        for file in uploaded_files:
-            if file and file.filename and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                # Add timestamp to avoid collisions
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"{timestamp}_{filename}"
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                # Store relative path from static folder
-                image_paths.append(f"uploads/{filename}")
+        # Extract form data; fields left out of the body are stored as NULL,
+        # as request.form.get() would have returned
+        title = form_fields['title'].text()
+        condition = form_fields['condition'].text()
+        measurements = form_fields['measurements'].text()
+        category = form_fields['category'].text()
+        image_paths = images.image_paths
         
-        # Insert into database
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        # The title part can come after the images, so this is only known
+        # once the body is read; don't keep files for a listing never saved
+        if not title:
+            images.remove_created()
+            return 'A title is required', 400
         
-        cur.execute("""
-            INSERT INTO craigslist_listings 
-            (jira_issue_key, title, condition, measurements, category, image_paths, status)
-            VALUES (%s, %s, %s, %s, %s, %s, 'draft')
-            RETURNING id
-        """, (issue_key, title, condition, measurements, category, image_paths))
+        # Insert into database
+        try:
+            with db_cursor() as cur:
+                cur.execute("""
+                    INSERT INTO craigslist_listings 
+                    (jira_issue_key, title, condition, measurements, category, image_paths, status)
+                    VALUES (%s, %s, %s, %s, %s, %s, 'draft')
+                    RETURNING id
+                """, (issue_key, title, condition, measurements, category, image_paths))
+                
+                listing_id = cur.fetchone()['id']
+        except Exception:
+            images.remove_created()
+            raise
         
-        listing_id = cur.fetchone()['id']
-        conn.commit()
-        cur.close()
-        conn.close()
+        # The issue now has a listing; fetch it fresh next time
+        with _jira_cache_lock:
+            _jira_issue_cache.pop(issue_key, None)
         
         flash(f'Listing created successfully! ID: {listing_id}', 'success')
         return redirect(url_for('listing_detail', listing_id=listing_id))
@@ -876,74 +1270,99 @@ def create_listing(issue_key):
     # Extract useful fields from JIRA
     initial_data = {
         'title': fields.get('summary', ''),
-        'description': fields.get('description', {}).get('content', [{}])[0].get('content', [{}])[0].get('text', '') if isinstance(fields.get('description'), dict) else '',
+        'description': issue.get('description_text', ''),
         'issue_key': issue_key,
         'issue_url': f"{JIRA_SITE_URL}/browse/{issue_key}"
     }
     
     return render_template('create_listing.html', issue=issue, initial_data=initial_data)
 
+def stream_listings_ndjson(query, params):
+    """Yield listing rows as NDJSON lines from a server-side cursor"""
+    with db_cursor(cursor_factory=None, name='stream_listings') as cur:
+        cur.itersize = 500
+        cur.execute(query, params)
+        columns = None
+        for row in cur:
+            # A named cursor only has a description after the first fetch
+            if columns is None:
+                columns = [col.name for col in cur.description]
+            yield orjson.dumps(dict(zip(columns, row)), default=_json_default) + b'\n'
+
 @app.route('/api/listings')
 def api_listings():
-    """JSON API endpoint for listings"""
+    """
+    JSON API endpoint for listings
+
+    Returns one page of listings, newest first. Pass the returned
+    next_cursor back as ?cursor= to fetch the following page, or use
+    ?format=ndjson to stream every matching listing, one per line.
+    """
     status_filter = request.args.get('status', 'all')
+    cursor = request.args.get('cursor')
     
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    conditions = []
+    params = []
     
-    if status_filter == 'all':
-        cur.execute("""
-            SELECT id, jira_issue_key, title, suggested_price, status, 
-                   condition, created_at, updated_at
-            FROM craigslist_listings 
-            ORDER BY created_at DESC
-        """)
-    else:
-        cur.execute("""
-            SELECT id, jira_issue_key, title, suggested_price, status, 
-                   condition, created_at, updated_at
-            FROM craigslist_listings 
-            WHERE status = %s
-            ORDER BY created_at DESC
-        """, (status_filter,))
+    if status_filter != 'all':
+        conditions.append("status = %s")
+        params.append(status_filter)
+    
+    if cursor:
+        # Keyset pagination on (created_at, id) of the last row already sent
+        cursor_created_at, _, cursor_id = cursor.rpartition(',')
+        if not cursor_id.isdigit():
+            return jsonify({'error': 'Invalid cursor'}), 400
+        try:
+            cursor_created_at = datetime.fromisoformat(cursor_created_at)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        conditions.append("(created_at, id) < (%s, %s)")
+        params.extend([cursor_created_at, int(cursor_id)])
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
     
-    listings = cur.fetchall()
-    cur.close()
-    conn.close()
+    # Order by the table column, not the to_char() output of the same name
+    query = f"""
+        SELECT id, jira_issue_key, title, suggested_price, status, condition,
+               to_char(created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US') AS created_at,
+               to_char(updated_at, 'YYYY-MM-DD"T"HH24:MI:SS.US') AS updated_at
+        FROM craigslist_listings 
+        {where}
+        ORDER BY craigslist_listings.created_at DESC, id DESC
+    """
+    
+    if request.args.get('format') == 'ndjson':
+        return Response(stream_listings_ndjson(query, params), mimetype='application/x-ndjson')
+    
+    with db_cursor(cursor_factory=None) as cur:
+        # Fetch one extra row to know whether another page follows
+        cur.execute(query + " LIMIT %s", params + [LISTINGS_PER_PAGE + 1])
+        columns = [col.name for col in cur.description]
+        listings = [dict(zip(columns, row)) for row in cur.fetchall()]
     
-    # Convert datetime objects to ISO format strings
-    for listing in listings:
-        if listing['created_at']:
-            listing['created_at'] = listing['created_at'].isoformat()
-        if listing['updated_at']:
-            listing['updated_at'] = listing['updated_at'].isoformat()
+    has_more = len(listings) > LISTINGS_PER_PAGE
+    listings = listings[:LISTINGS_PER_PAGE]
     
-    return jsonify(listings)
+    next_cursor = None
+    if has_more:
+        next_cursor = f"{listings[-1]['created_at']},{listings[-1]['id']}"
+    
+    return jsonify({'items': listings, 'next_cursor': next_cursor})
 
 @app.route('/listing/<int:listing_id>/research', methods=['POST'])
 def trigger_research(listing_id):
     """Trigger research workflow for a listing"""
     # Check if listing exists
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    
-    cur.execute("SELECT id, status FROM craigslist_listings WHERE id = %s", (listing_id,))
-    listing = cur.fetchone()
+    with db_cursor() as cur:
+        cur.execute("SELECT id, status FROM craigslist_listings WHERE id = %s", (listing_id,))
+        listing = cur.fetchone()
     
     if not listing:
-        cur.close()
-        conn.close()
         return jsonify({'success': False, 'error': 'Listing not found'}), 404
     
-    # Trigger the n8n workflow in a separate thread so we can respond immediately
-    def async_trigger():
-        trigger_n8n_research(listing_id)
-    
-    thread = threading.Thread(target=async_trigger)
-    thread.start()
-    
-    cur.close()
-    conn.close()
+    # Trigger the n8n workflow in the background so we can respond immediately
+    RESEARCH_EXECUTOR.submit(research_task, listing_id)
     
     flash('Research started! The page will update as results come in.', 'success')
     return jsonify({'success': True, 'message': 'Research started'})
@@ -953,88 +1372,39 @@ def delete_source(listing_id, source_id):
     """Delete a research source and recalculate pricing"""
     print(f"Delete source called: listing_id={listing_id}, source_id={source_id}")
     
-    conn = None
-    cur = None
-    
     try:
-        conn = get_db_connection()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        # Verify the source belongs to this listing
-        cur.execute("""
-            SELECT id FROM craigslist_sources 
-            WHERE id = %s AND listing_id = %s
-        """, (source_id, listing_id))
-        
-        source = cur.fetchone()
+        with db_cursor() as cur:
+            # The sources_price_sync triggers reprice the listing
+            cur.execute("""
+                DELETE FROM craigslist_sources
+                WHERE id = %s AND listing_id = %s
+                RETURNING id
+            """, (source_id, listing_id))
+            
+            if cur.fetchone():
+                cur.execute("EXECUTE listing_pricing (%s)", (listing_id,))
+                stats = cur.fetchone()
+            else:
+                stats = None
         
-        if not source:
+        if not stats:
             print(f"Source not found: source_id={source_id}, listing_id={listing_id}")
-            if cur:
-                cur.close()
-            if conn:
-                conn.close()
             return jsonify({'success': False, 'error': 'Source not found'}), 404
         
-        print(f"Deleting source {source_id}...")
-        
-        # Delete the source
-        cur.execute("DELETE FROM craigslist_sources WHERE id = %s", (source_id,))
-        
-        # Recalculate price statistics
-        cur.execute("""
-            SELECT 
-                COUNT(*) as source_count,
-                MIN(price) as min_price,
-                MAX(price) as max_price,
-                AVG(price) as avg_price
-            FROM craigslist_sources
-            WHERE listing_id = %s AND price IS NOT NULL
-        """, (listing_id,))
-        
-        stats = cur.fetchone()
         print(f"Recalculated stats: {stats}")
         
-        # Update listing with new price info
-        if stats and stats['source_count'] > 0:
-            cur.execute("""
-                UPDATE craigslist_listings 
-                SET price_min = %s,
-                    price_max = %s,
-                    suggested_price = %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (
-                stats['min_price'],
-                stats['max_price'],
-                round(float(stats['avg_price']), 2) if stats['avg_price'] else None,
-                listing_id
-            ))
-            
+        if stats['source_count'] > 0:
             message = f"Source deleted. Updated pricing: ${stats['min_price']:.2f} - ${stats['max_price']:.2f}"
         else:
-            # No sources left, clear pricing
-            cur.execute("""
-                UPDATE craigslist_listings 
-                SET price_min = NULL,
-                    price_max = NULL,
-                    suggested_price = NULL,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (listing_id,))
-            
+            # No priced sources left, so pricing was cleared
             message = "Source deleted. No sources remaining - pricing cleared."
         
-        conn.commit()
         print(f"Success: {message}")
         
-        cur.close()
-        conn.close()
-        
         return jsonify({
             'success': True,
             'message': message,
-            'stats': dict(stats) if stats and stats['source_count'] > 0 else None
+            'stats': dict(stats) if stats['source_count'] > 0 else None
         }), 200
         
     except Exception as e:
@@ -1043,49 +1413,31 @@ def delete_source(listing_id, source_id):
         print(f"Error deleting source: {e}")
         print(error_trace)
         
-        if conn:
-            conn.rollback()
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
-        
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/listing/<int:listing_id>/sources/delete-all', methods=['POST'])
 def delete_all_sources(listing_id):
     """Delete all research sources for a listing"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    
     try:
-        # Check if listing exists
-        cur.execute("SELECT id FROM craigslist_listings WHERE id = %s", (listing_id,))
-        if not cur.fetchone():
-            cur.close()
-            conn.close()
-            return jsonify({'success': False, 'error': 'Listing not found'}), 404
-        
-        # Get count before deleting
-        cur.execute("SELECT COUNT(*) as count FROM craigslist_sources WHERE listing_id = %s", (listing_id,))
-        count = cur.fetchone()['count']
-        
-        # Delete all sources for this listing
-        cur.execute("DELETE FROM craigslist_sources WHERE listing_id = %s", (listing_id,))
+        with db_cursor() as cur:
+            # Delete all sources in one statement; the sources_price_sync
+            # triggers clear the listing's pricing
+            cur.execute("""
+                WITH del AS (
+                    DELETE FROM craigslist_sources
+                    WHERE listing_id = %(listing_id)s
+                    RETURNING 1
+                )
+                SELECT (SELECT COUNT(*) FROM del) as count,
+                       EXISTS (SELECT 1 FROM craigslist_listings WHERE id = %(listing_id)s) as found
+            """, {'listing_id': listing_id})
+            
+            result = cur.fetchone()
         
-        # Clear pricing from listing
-        cur.execute("""
-            UPDATE craigslist_listings 
-            SET price_min = NULL,
-                price_max = NULL,
-                suggested_price = NULL,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-        """, (listing_id,))
+        if not result['found']:
+            return jsonify({'success': False, 'error': 'Listing not found'}), 404
         
-        conn.commit()
-        cur.close()
-        conn.close()
+        count = result['count']
         
         return jsonify({
             'success': True,
@@ -1093,9 +1445,6 @@ def delete_all_sources(listing_id):
         })
         
     except Exception as e:
-        conn.rollback()
-        cur.close()
-        conn.close()
         print(f"Error deleting all sources: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1103,13 +1452,14 @@ def delete_all_sources(listing_id):
 def health_check():
     """Health check endpoint"""
     try:
-        conn = get_db_connection()
-        conn.close()
+        with db_cursor(cursor_factory=None) as cur:
+            cur.execute("SELECT 1")
         return jsonify({'status': 'healthy', 'database': 'connected'}), 200
     except Exception as e:
         return jsonify({'status': 'unhealthy', 'error': str(e)}), 500
 
 if __name__ == '__main__':
+    # Development server only - production runs under gunicorn via wsgi.py
     # Validate required environment variables
     required_vars = ['DB_HOST', 'DB_NAME', 'DB_USER', 'DB_PASSWORD']
     missing_vars = [var for var in required_vars if not os.getenv(var)]
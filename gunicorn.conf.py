@@ -0,0 +1,19 @@
+"""
+Gunicorn settings for wsgi:app
+
+Picked up automatically when gunicorn is started from this directory:
+    gunicorn wsgi:app
+
+Each gevent worker multiplexes many requests while they wait on Postgres,
+JIRA or Craigslist, so throughput scales with worker_connections rather
+than the number of workers. Every worker has its own database pool of up
+to DB_POOL_MAX connections; requests beyond that wait up to DB_POOL_TIMEOUT
+seconds for one. Keep workers * DB_POOL_MAX below Postgres max_connections.
+"""
+
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '8000')}")
+worker_class = 'gevent'
+workers = int(os.getenv('GUNICORN_WORKERS', 2))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 200))
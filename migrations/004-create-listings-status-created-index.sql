@@ -0,0 +1,12 @@
+-- Indexes for the listings page / API filters (WHERE status = ... ORDER BY created_at DESC).
+-- CONCURRENTLY cannot run inside a transaction block, so apply this file without -1/--single-transaction.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_listings_status_created
+    ON craigslist_listings (status, created_at DESC)
+    INCLUDE (id, jira_issue_key, title, suggested_price, condition, updated_at,
+             list_price, sold_price, listed_at, sold_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_listings_created
+    ON craigslist_listings (created_at DESC);
+
+-- Superseded by the leading status column of ix_listings_status_created
+DROP INDEX CONCURRENTLY IF EXISTS idx_status;
@@ -0,0 +1,55 @@
+-- Keep a listing's price_min / price_max / suggested_price in sync with its sources.
+-- Statement-level triggers aggregate once per statement over the listings the
+-- statement touched (via transition tables), instead of the app recomputing
+-- after every insert or delete. Transition tables need one trigger per event.
+CREATE OR REPLACE FUNCTION sync_listing_prices() RETURNS trigger AS $$
+DECLARE
+    affected INTEGER[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT listing_id) INTO affected FROM new_rows;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(DISTINCT listing_id) INTO affected
+        FROM (SELECT listing_id FROM old_rows UNION SELECT listing_id FROM new_rows) a;
+    ELSE
+        SELECT array_agg(DISTINCT listing_id) INTO affected FROM old_rows;
+    END IF;
+
+    -- A listing with no priced sources left has its pricing cleared, except
+    -- on insert: a batch of unpriced sources leaves existing pricing alone
+    UPDATE craigslist_listings l
+    SET price_min = s.min_price,
+        price_max = s.max_price,
+        suggested_price = ROUND(s.avg_price, 2),
+        updated_at = CURRENT_TIMESTAMP
+    FROM (
+        SELECT a.listing_id,
+               MIN(cs.price) AS min_price,
+               MAX(cs.price) AS max_price,
+               AVG(cs.price) AS avg_price
+        FROM unnest(affected) AS a(listing_id)
+        LEFT JOIN craigslist_sources cs
+            ON cs.listing_id = a.listing_id AND cs.price IS NOT NULL
+        GROUP BY a.listing_id
+    ) s
+    WHERE l.id = s.listing_id
+      AND (TG_OP <> 'INSERT' OR s.min_price IS NOT NULL);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER sources_price_sync_insert
+    AFTER INSERT ON craigslist_sources
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_listing_prices();
+
+CREATE TRIGGER sources_price_sync_update
+    AFTER UPDATE ON craigslist_sources
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_listing_prices();
+
+CREATE TRIGGER sources_price_sync_delete
+    AFTER DELETE ON craigslist_sources
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION sync_listing_prices();
@@ -0,0 +1,6 @@
+-- Lets the per-listing MIN/MAX/AVG/COUNT(price) aggregates (sync_listing_prices,
+-- listing_pricing) run as index-only scans instead of visiting the heap.
+-- CONCURRENTLY cannot run inside a transaction block, so apply this file without -1/--single-transaction.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sources_listing_price
+    ON craigslist_sources (listing_id, price)
+    WHERE price IS NOT NULL;
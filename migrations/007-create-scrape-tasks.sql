@@ -0,0 +1,13 @@
+-- Progress of background Craigslist scrapes. The scrape runs in one gunicorn
+-- worker but /scrape-status/<task_id> may be served by any of them, so the
+-- latest progress event lives here rather than in process memory.
+CREATE TABLE IF NOT EXISTS scrape_tasks (
+    id TEXT PRIMARY KEY,
+    listing_id INTEGER NOT NULL REFERENCES craigslist_listings(id) ON DELETE CASCADE,
+    event JSONB NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_scrape_tasks_updated_at ON scrape_tasks(updated_at);
+
+GRANT ALL PRIVILEGES ON TABLE scrape_tasks TO flasker;
@@ -5,12 +5,87 @@ Searches Craigslist for similar items and extracts listing data
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+from cachetools import TTLCache
+import lxml.html
+import logging
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote_plus, urljoin
 import re
 from typing import List, Dict, Optional
 
+# Per-listing progress goes to this logger at DEBUG, so it costs nothing
+# unless debug logging is switched on; one-off summaries stay on stdout
+log = logging.getLogger(__name__)
+
+# Patterns used for every parsed listing, compiled once
+_RESULT_CLASS_RE = re.compile(r'result|search-result')
+_CONDITION_RE = re.compile(r'condition:\s*(\w+)', re.IGNORECASE)
+_DIMENSION_RE = re.compile(r'dimension|size|measurement|"|inches|feet|cm|mm', re.IGNORECASE)
+
+def _parse_price(text):
+    """
+    Parse the first number in a price string such as '$1,234.56'
+
+    Returns None when the text holds no number.
+    """
+    end = len(text)
+    start = 0
+    while start < end and not text[start].isdigit():
+        start += 1
+    stop = start
+    while stop < end and (text[stop].isdigit() or text[stop] in ',.'):
+        stop += 1
+    digits = text[start:stop].replace(',', '').rstrip('.')
+    if not digits:
+        return None
+    try:
+        return float(digits)
+    except ValueError:
+        return None
+
+def _has_class(name):
+    """XPath predicate matching elements whose class list contains name"""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+# Parsed detail pages by URL, shared by every scraper in the process so a
+# repeated search doesn't refetch listings it has already seen
+_details_cache = TTLCache(maxsize=512, ttl=3600)
+_details_cache_lock = threading.Lock()
+
+class RateLimiter:
+    """
+    Context manager that caps concurrent requests and spaces their starts
+
+    At most max_concurrent holders at once, and each entry starts at least
+    min_interval seconds after the previous one.
+    """
+    
+    def __init__(self, max_concurrent=2, min_interval=0.2):
+        self._slots = threading.Semaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._min_interval = min_interval
+        self._next_start = 0.0
+    
+    def __enter__(self):
+        self._slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._min_interval
+        if start > now:
+            time.sleep(start - now)
+        return self
+    
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
+
 class CraigslistScraper:
     """Scraper for Craigslist listings"""
     
@@ -20,6 +95,23 @@ class CraigslistScraper:
         'boston': 'https://boston.craigslist.org'
     }
     
+    # Candidate selectors per search-result field, in priority order. All
+    # results on one page share a format, so the first candidate that
+    # matches the first result is used for the rest (see _detect_selectors).
+    FIELD_SELECTORS = {
+        'link': ('a.posting-title', 'a.titlestring', 'a[href*="/d/"]', 'a'),
+        'title': ('span.label', 'div.title', 'h3'),
+        'price': ('span.priceinfo', 'span.price', '[class*="price"]'),
+        'location': ('span.meta', 'div.location', '[class*="location"]'),
+        'date': ('time', 'span.date', '[datetime]'),
+    }
+    
+    # Detail pages are fetched in parallel, but politely: no more than
+    # MAX_CONCURRENT_REQUESTS in flight, started MIN_REQUEST_INTERVAL apart
+    DETAIL_WORKERS = 5
+    MAX_CONCURRENT_REQUESTS = 2
+    MIN_REQUEST_INTERVAL = 0.2
+    
     def __init__(self, region='vermont', max_results=10):
         """
         Initialize scraper
@@ -39,6 +131,16 @@ class CraigslistScraper:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         })
+        # Keep connections alive across the parallel detail fetches and
+        # retry transient failures with backoff (honouring Retry-After on 429)
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.rate_limiter = RateLimiter(self.MAX_CONCURRENT_REQUESTS, self.MIN_REQUEST_INTERVAL)
     
     def search(self, query: str) -> List[Dict]:
         """
@@ -56,14 +158,13 @@ class CraigslistScraper:
         print(f"Searching Craigslist: {search_url}")
         
         try:
-            response = self.session.get(search_url, timeout=10)
-            response.raise_for_status()
-            
-            # Debug: Save the HTML to see what we're getting
-            print(f"Response status: {response.status_code}")
-            print(f"Response length: {len(response.content)} bytes")
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Parse straight from the (decompressed) socket stream rather
+            # than buffering response.content first
+            with self.session.get(search_url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                print(f"Response status: {response.status_code}")
+                response.raw.decode_content = True
+                soup = BeautifulSoup(response.raw, 'lxml')
             
             # Try multiple possible selectors for listings
             # New Craigslist uses different class names
@@ -80,35 +181,47 @@ class CraigslistScraper:
             
             if not listings:
                 # Try even more generic
-                listings = soup.find_all('li', class_=re.compile(r'result|search-result'))
+                listings = soup.find_all('li', class_=_RESULT_CLASS_RE)
                 print(f"Found {len(listings)} listings with regex pattern")
             
             if not listings:
-                print("DEBUG: No listings found. Saving HTML for inspection...")
-                with open('/tmp/craigslist_debug.html', 'w', encoding='utf-8') as f:
-                    f.write(soup.prettify())
-                print("HTML saved to /tmp/craigslist_debug.html")
-                
-                # Print first 2000 chars to see structure
-                print("\nFirst 2000 characters of page:")
-                print(soup.prettify()[:2000])
+                print("No listings found")
+                # Dumping the page walks the whole DOM, so only do it on request
+                if os.getenv('CL_SCRAPER_DEBUG'):
+                    with open('/tmp/craigslist_debug.html', 'w', encoding='utf-8') as f:
+                        f.write(soup.decode())
+                    print("DEBUG: HTML saved to /tmp/craigslist_debug.html")
                 return []
             
-            results = []
-            for listing in listings[:self.max_results]:
+            listings = listings[:self.max_results]
+            selectors = self._detect_selectors(listings[0])
+            log.debug("Using selectors %s", selectors)
+            
+            basics = []
+            for listing in listings:
                 try:
-                    listing_data = self._parse_listing(listing)
+                    listing_data = self._parse_listing(listing, selectors)
                     if listing_data:
-                        results.append(listing_data)
-                        print(f"  ✓ Found: {listing_data['title'][:50]}...")
-                        
-                        # Be polite - small delay between parsing
-                        time.sleep(0.5)
+                        basics.append(listing_data)
+                        log.debug("Found: %s", listing_data['title'][:50])
                         
                 except Exception as e:
                     print(f"  ✗ Error parsing listing: {e}")
                     continue
             
+            # Fetch full listing pages for more details, overlapping the
+            # network waits; the rate limiter keeps this polite
+            with ThreadPoolExecutor(max_workers=self.DETAIL_WORKERS) as executor:
+                details = list(executor.map(
+                    self._fetch_listing_details,
+                    [listing_data['url'] for listing_data in basics]
+                ))
+            
+            results = [
+                {**listing_data, **detailed_data}
+                for listing_data, detailed_data in zip(basics, details)
+            ]
+            
             print(f"Successfully parsed {len(results)} listings")
             return results
             
@@ -116,27 +229,43 @@ class CraigslistScraper:
             print(f"Error fetching search results: {e}")
             return []
     
-    def _parse_listing(self, listing_element) -> Optional[Dict]:
+    def _detect_selectors(self, listing_element) -> Dict[str, str]:
+        """
+        Pick one selector per field from FIELD_SELECTORS for this page
+        
+        Args:
+            listing_element: First search result element on the page
+            
+        Returns:
+            Dictionary mapping each field to the first candidate selector that
+            matches listing_element, or to a union of all candidates when none do
+        """
+        selectors = {}
+        for field, candidates in self.FIELD_SELECTORS.items():
+            selectors[field] = next(
+                (selector for selector in candidates if listing_element.select_one(selector)),
+                ', '.join(candidates)
+            )
+        return selectors
+    
+    def _parse_listing(self, listing_element, selectors: Dict[str, str]) -> Optional[Dict]:
         """
-        Parse a single listing element
+        Parse the basic fields of a single search result element
+        
+        Detail-page fields are filled in separately by _fetch_listing_details.
         
         Args:
             listing_element: BeautifulSoup element containing listing
+            selectors: Field selectors from _detect_selectors
             
         Returns:
             Dictionary with listing data or None if parsing fails
         """
         try:
-            # Try to find the link - multiple possible locations
-            link_element = (
-                listing_element.find('a', class_='posting-title') or
-                listing_element.find('a', class_='titlestring') or
-                listing_element.select_one('a[href*="/d/"]') or
-                listing_element.find('a')
-            )
+            link_element = listing_element.select_one(selectors['link'])
             
             if not link_element:
-                print("  No link found in listing")
+                log.debug("No link found in listing")
                 return None
             
             url = link_element.get('href')
@@ -156,68 +285,43 @@ class CraigslistScraper:
             
             # Try finding title element
             if not title:
-                title_element = (
-                    listing_element.find('span', class_='label') or
-                    listing_element.find('div', class_='title') or
-                    listing_element.find('h3')
-                )
+                title_element = listing_element.select_one(selectors['title'])
                 if title_element:
                     title = title_element.get_text(strip=True)
             
             if not title:
-                print("  No title found in listing")
+                log.debug("No title found in listing")
                 return None
             
-            # Extract price - try multiple selectors
+            # Extract price
             price = None
-            price_element = (
-                listing_element.find('span', class_='priceinfo') or
-                listing_element.find('span', class_='price') or
-                listing_element.select_one('[class*="price"]')
-            )
+            price_element = listing_element.select_one(selectors['price'])
             
             if price_element:
                 price_text = price_element.get_text(strip=True)
                 # Extract numeric value from price string
-                price_match = re.search(r'\$?(\d+(?:,\d{3})*(?:\.\d{2})?)', price_text)
-                if price_match:
-                    price = float(price_match.group(1).replace(',', ''))
+                price = _parse_price(price_text)
             
             # Extract location
             location = None
-            location_element = (
-                listing_element.find('span', class_='meta') or
-                listing_element.find('div', class_='location') or
-                listing_element.select_one('[class*="location"]')
-            )
+            location_element = listing_element.select_one(selectors['location'])
             if location_element:
                 location = location_element.get_text(strip=True)
             
             # Extract posting date
             posted_date = None
-            date_element = (
-                listing_element.find('time') or
-                listing_element.find('span', class_='date') or
-                listing_element.select_one('[datetime]')
-            )
+            date_element = listing_element.select_one(selectors['date'])
             if date_element:
                 posted_date = date_element.get('datetime') or date_element.get_text(strip=True)
             
-            print(f"  Parsed basic info - Title: {title[:30]}..., Price: ${price}, URL: {url}")
-            
-            # Fetch full listing page for more details
-            detailed_data = self._fetch_listing_details(url)
+            log.debug("Parsed basic info title=%s price=%s url=%s", title[:30], price, url)
             
             return {
                 'title': title,
                 'url': url,
                 'price': price,
                 'location': location,
-                'posted_date': posted_date,
-                'description': detailed_data.get('description'),
-                'condition': detailed_data.get('condition'),
-                'measurements': detailed_data.get('measurements'),
-                'image_url': detailed_data.get('image_url')
+                'posted_date': posted_date
             }
             
         except Exception as e:
@@ -236,6 +340,11 @@ class CraigslistScraper:
         Returns:
             Dictionary with detailed listing data
         """
+        with _details_cache_lock:
+            cached = _details_cache.get(url)
+        if cached is not None:
+            return cached
+        
         details = {
             'description': None,
             'condition': None,
@@ -244,55 +353,58 @@ class CraigslistScraper:
         }
         
         try:
-            print(f"  Fetching details from: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            log.debug("Fetching details from %s", url)
+            with self.rate_limiter, self.session.get(url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                # Only four fields are needed, so a bare lxml tree and XPath
+                # is enough; no BeautifulSoup wrapper objects
+                tree = lxml.html.parse(response.raw).getroot()
             
             # Extract description
-            description_element = soup.find('section', id='postingbody')
-            if description_element:
+            description_elements = tree.xpath('//section[@id="postingbody"]')
+            if description_elements:
+                description_element = description_elements[0]
                 # Remove the "QR Code Link to This Post" text
-                for qr in description_element.find_all('div', class_='print-qrcode-container'):
-                    qr.decompose()
-                details['description'] = description_element.get_text(strip=True)
-            
-            # Extract condition from attributes
-            attr_groups = soup.find_all('p', class_='attrgroup')
-            for group in attr_groups:
-                for span in group.find_all('span'):
-                    text = span.get_text(strip=True)
-                    # Look for condition
-                    if 'condition:' in text.lower():
-                        condition_match = re.search(r'condition:\s*(\w+)', text, re.IGNORECASE)
-                        if condition_match:
-                            details['condition'] = condition_match.group(1).title()
-                    
-                    # Look for dimensions/measurements
-                    if any(dim in text.lower() for dim in ['dimension', 'size', 'measurement', '"', 'inches', 'feet', 'cm', 'mm']):
-                        details['measurements'] = text
-            
-            # Extract first image - try multiple selectors
-            image_element = (
-                soup.find('div', class_='slide first visible') or
-                soup.find('div', class_='slide') or
-                soup.select_one('.gallery img') or
-                soup.find('img', src=re.compile(r'images\.craigslist\.org'))
+                for qr in description_element.xpath(f'.//div[{_has_class("print-qrcode-container")}]'):
+                    qr.drop_tree()
+                details['description'] = description_element.text_content().strip()
+            
+            # Extract condition from attributes, stopping once both the
+            # condition and the measurements have been found
+            for span in tree.xpath(f'//p[{_has_class("attrgroup")}]//span'):
+                text = ' '.join(span.text_content().split())
+                # Look for condition
+                if not details['condition'] and 'condition:' in text.lower():
+                    condition_match = _CONDITION_RE.search(text)
+                    if condition_match:
+                        details['condition'] = condition_match.group(1).title()
+                
+                # Look for dimensions/measurements
+                if not details['measurements'] and _DIMENSION_RE.search(text):
+                    details['measurements'] = text
+                
+                if details['condition'] and details['measurements']:
+                    break
+            
+            # Extract first image; the XPath union is in document order, and
+            # the first slide is the visible one
+            image_urls = tree.xpath(
+                f'//div[{_has_class("slide")}]//img/@src'
+                f' | //*[{_has_class("gallery")}]//img/@src'
+                ' | //img[contains(@src, "images.craigslist.org")]/@src'
             )
+            if image_urls:
+                details['image_url'] = str(image_urls[0])
             
-            if image_element:
-                if image_element.name == 'img':
-                    details['image_url'] = image_element.get('src')
-                else:
-                    img = image_element.find('img')
-                    if img and img.get('src'):
-                        details['image_url'] = img['src']
-            
-            print(f"    Details: Desc={bool(details['description'])}, Condition={details['condition']}, Image={bool(details['image_url'])}")
+            log.debug(
+                "Details desc=%s condition=%s image=%s",
+                bool(details['description']), details['condition'], bool(details['image_url'])
+            )
             
-            # Small delay to be respectful
-            time.sleep(1)
+            # Only successful fetches are cached; failures are retried next time
+            with _details_cache_lock:
+                _details_cache[url] = details
             
         except Exception as e:
             print(f"  Error fetching listing details from {url}: {e}")
@@ -320,6 +432,8 @@ if __name__ == '__main__':
     # Test the scraper
     import sys
     
+    logging.basicConfig(level=logging.DEBUG, format='  %(message)s')
+    
     if len(sys.argv) > 1:
         query = ' '.join(sys.argv[1:])
     else:
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Production entrypoint for the Craigslist Listings Viewer
+
+Run with:
+    gunicorn wsgi:app
+
+(worker class and counts come from gunicorn.conf.py)
+
+The gevent worker monkey-patches the standard library before loading this
+module; psycopg2 is a C extension, so it is patched separately here to
+yield to the gevent hub while waiting on Postgres.
+"""
+
+from psycogreen.gevent import patch_psycopg
+
+patch_psycopg()
+
+from app import app  # noqa: E402